@@ -8,12 +8,20 @@ from flask import Flask, render_template_string, request, jsonify
 import subprocess
 import os
 import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
 app = Flask(__name__)
 SCRIPT_DIR = Path(__file__).parent
 
+# Files that make up a release; beacons_config.json is user data and lives outside releases
+RELEASE_FILES = ['simulate_beacon.py', 'index.html']
+KEEP_RELEASES = 5
+RELEASE_HISTORY = '.release_history'  # One release id per activation, oldest first
+MAX_PARALLEL_HOSTS = 8
+
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
@@ -253,6 +261,139 @@ HTML_TEMPLATE = """
 def index():
     return render_template_string(HTML_TEMPLATE)
 
+def compute_release_id():
+    """Content hash of the release files, so identical code is never uploaded twice"""
+    digest = hashlib.sha256()
+    for name in RELEASE_FILES:
+        digest.update(name.encode())
+        digest.update(b'\0')
+        digest.update((SCRIPT_DIR / name).read_bytes())
+    return digest.hexdigest()[:12]
+
+def ssh_command(host, remote_cmd):
+    return f"sshpass -p '{host['password']}' ssh -o StrictHostKeyChecking=no {host['user']}@{host['ip']} '{remote_cmd}'"
+
+def run_remote(host, remote_cmd):
+    return subprocess.run(ssh_command(host, remote_cmd), shell=True, capture_output=True, text=True)
+
+def activate_release_cmd(directory, release_id):
+    """Remote shell snippet that points current/ at a release with one atomic rename.
+
+    The top-level files become symlinks into current/, so run_detached.sh keeps
+    starting ~/<dir>/simulate_beacon.py. A plain file left by an older deploy
+    is kept as a timestamped backup the first time. Every activation is
+    appended to the history file that rollback and pruning rely on.
+    """
+    backup_suffix = f".backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    links = ' && '.join(
+        f'{{ [ -L {name} ] || {{ [ -e {name} ] && mv {name} {name}{backup_suffix}; }}; ln -sfn current/{name} {name}; }}'
+        for name in RELEASE_FILES
+    )
+    history = (f'echo {release_id} >> {RELEASE_HISTORY} && tail -n 50 {RELEASE_HISTORY} > {RELEASE_HISTORY}.new && '
+               f'mv -f {RELEASE_HISTORY}.new {RELEASE_HISTORY}')
+    return (f'cd ~/{directory} && test -d releases/{release_id} && '
+            f'ln -sfn releases/{release_id} current.new && mv -Tf current.new current && {links} && {history}')
+
+def restart_service_cmd(directory):
+    return f"""
+        cd ~/{directory} && 
+        screen -X -S beacon_simulator quit 2>/dev/null || true &&
+        sleep 2 &&
+        chmod +x simulate_beacon.py run_detached.sh &&
+        ./run_detached.sh &&
+        sleep 2 &&
+        if screen -list | grep -q "beacon_simulator"; then
+            echo "Service started successfully"
+        else
+            echo "Warning: Service may not have started"
+        fi
+        """
+
+def list_host_releases(host):
+    """Releases on one Pi, most recently activated first, with the active one flagged.
+
+    Order comes from the activation history, not directory mtimes: redeploying
+    a release that is already on the Pi does not touch its directory.
+    """
+    directory = host['dir']
+    result = run_remote(host, f'cd ~/{directory} && readlink current; echo ---; cat {RELEASE_HISTORY} 2>/dev/null; echo ---; ls -1 releases 2>/dev/null')
+    if result.returncode != 0 or result.stdout.count('---') != 2:
+        return {'success': False, 'error': result.stderr.strip() or 'No releases found'}
+    link, history, names = (part.split() for part in result.stdout.split('---'))
+    current = link[0].rsplit('/', 1)[-1] if link and link[0].startswith('releases/') else None
+    available = [name for name in names if not name.endswith('.tmp')]
+    if not history and current:
+        history = [current]
+    
+    ordered = []
+    for name in reversed(history):
+        if name in available and name not in ordered:
+            ordered.append(name)
+    ordered += sorted(name for name in available if name not in ordered)
+    # Latest activation that is not the running release, like 'cd -'
+    previous = next((name for name in reversed(history) if name != current and name in available), None)
+    return {'success': True, 'current': current, 'previous': previous,
+            'releases': [{'id': name, 'current': name == current} for name in ordered]}
+
+def prune_host_releases(host, keep=KEEP_RELEASES):
+    """Delete all but the keep most recently activated releases (never current or staging)"""
+    listing = list_host_releases(host)
+    if not listing['success']:
+        return listing
+    stale = [release['id'] for release in listing['releases'][keep:] if not release['current']]
+    if stale:
+        paths = ' '.join(f'releases/{name}' for name in stale)
+        result = run_remote(host, f'cd ~/{host["dir"]} && rm -rf {paths}')
+        if result.returncode != 0:
+            return {'success': False, 'error': result.stderr.strip() or 'Failed to prune releases'}
+    return {'success': True, 'pruned': stale}
+
+def rollback_host(host, release_id=None):
+    """Switch one Pi to release_id (default: the release activated before the current one)"""
+    listing = list_host_releases(host)
+    if not listing['success']:
+        return listing
+    ids = [release['id'] for release in listing['releases']]
+    if release_id is None:
+        if listing['previous'] is None:
+            return {'success': False, 'error': 'No previous release to roll back to'}
+        release_id = listing['previous']
+    elif release_id not in ids:
+        return {'success': False, 'error': f'Release {release_id} not found'}
+    result = run_remote(host, activate_release_cmd(host['dir'], release_id))
+    if result.returncode != 0:
+        return {'success': False, 'error': result.stderr.strip() or f'Failed to activate {release_id}'}
+    result = run_remote(host, restart_service_cmd(host['dir']))
+    if result.returncode != 0:
+        return {'success': False, 'error': result.stderr.strip() or 'Failed to restart service',
+                'previous': listing['current'], 'current': release_id}
+    return {'success': True, 'previous': listing['current'], 'current': release_id}
+
+def for_each_host(config, action):
+    """Run action(host) on every host of the request in parallel, keyed by IP"""
+    hosts = config.get('hosts') or [config]
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_HOSTS, len(hosts))) as pool:
+        results = list(pool.map(action, hosts))
+    by_host = {host['ip']: result for host, result in zip(hosts, results)}
+    return jsonify({'success': all(result['success'] for result in results), 'hosts': by_host})
+
+@app.route('/releases', methods=['POST'])
+def releases():
+    """List releases on one host ({ip, user, password, dir}) or many ({hosts: [...]})"""
+    try:
+        return for_each_host(request.json, list_host_releases)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/rollback', methods=['POST'])
+def rollback():
+    """Activate an existing release (optional 'release' id, default previous) on one or many hosts"""
+    try:
+        config = request.json
+        return for_each_host(config, lambda host: rollback_host(host, config.get('release')))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/deploy', methods=['POST'])
 def deploy():
     config = request.json
@@ -266,7 +407,7 @@ def deploy():
         port = config['port']
         
         rpi_addr = f"{user}@{ip}"
-        backup_suffix = f".backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        host = {'ip': ip, 'user': user, 'password': password, 'dir': directory}
         
         logs.append(f"🔍 Connecting to Raspberry Pi: {rpi_addr}")
         
@@ -278,46 +419,55 @@ def deploy():
         
         logs.append("📁 Required files checked")
         
-        # Create backup command
-        backup_cmd = f"sshpass -p '{password}' ssh -o StrictHostKeyChecking=no {rpi_addr} 'cp ~/{directory}/simulate_beacon.py ~/{directory}/simulate_beacon.py{backup_suffix} 2>/dev/null || echo \"No backup needed\"'"
+        release_id = compute_release_id()
+        logs.append(f"🏷️  Release {release_id}")
         
-        logs.append("💾 Creating backup...")
-        result = subprocess.run(backup_cmd, shell=True, capture_output=True, text=True)
-        logs.append(f"✓ Backup: simulate_beacon.py{backup_suffix}")
-        
-        # Copy files
-        files_to_copy = [
-            ('simulate_beacon.py', 'simulate_beacon.py'),
-            ('index.html', 'index.html'),
-            ('beacons_config.json', 'beacons_config.json')
-        ]
-        
-        for local_file, remote_file in files_to_copy:
-            logs.append(f"📤 Uploading {local_file}...")
-            scp_cmd = f"sshpass -p '{password}' scp -o StrictHostKeyChecking=no {SCRIPT_DIR / local_file} {rpi_addr}:~/{directory}/{remote_file}"
-            result = subprocess.run(scp_cmd, shell=True, capture_output=True, text=True)
+        # Identical code already on the Pi: activation is a single symlink swap
+        result = run_remote(host, f'test -d ~/{directory}/releases/{release_id}')
+        if result.returncode == 0:
+            logs.append("✓ Release already on Raspberry Pi, skipping upload")
+        else:
+            staging = f"~/{directory}/releases/{release_id}.tmp"
+            result = run_remote(host, f'rm -rf {staging} && mkdir -p {staging}')
+            if result.returncode != 0:
+                return jsonify({'success': False, 'error': f'Failed to create release directory: {result.stderr}'}), 500
             
+            local_paths = ' '.join(str(SCRIPT_DIR / name) for name in RELEASE_FILES)
+            scp_cmd = f"sshpass -p '{password}' scp -o StrictHostKeyChecking=no {local_paths} {rpi_addr}:{staging}/"
+            result = subprocess.run(scp_cmd, shell=True, capture_output=True, text=True)
             if result.returncode != 0:
-                return jsonify({'success': False, 'error': f'Failed to upload {local_file}: {result.stderr}'}), 500
+                return jsonify({'success': False, 'error': f'Failed to upload release: {result.stderr}'}), 500
+            logs.append(f"📤 Uploading release ({', '.join(RELEASE_FILES)})")
             
-            logs.append(f"✓ {local_file} uploaded")
+            # Publish the release directory only once it is complete
+            result = run_remote(host, f'mv {staging} ~/{directory}/releases/{release_id}')
+            if result.returncode != 0:
+                return jsonify({'success': False, 'error': f'Failed to publish release: {result.stderr}'}), 500
+            logs.append("✓ Release uploaded")
+        
+        # Presets are user data: only seed them on a fresh Pi
+        result = run_remote(host, f'test -f ~/{directory}/beacons_config.json')
+        if result.returncode != 0:
+            logs.append("📤 Uploading beacons_config.json...")
+            scp_cmd = f"sshpass -p '{password}' scp -o StrictHostKeyChecking=no {SCRIPT_DIR / 'beacons_config.json'} {rpi_addr}:~/{directory}/beacons_config.json"
+            result = subprocess.run(scp_cmd, shell=True, capture_output=True, text=True)
+            if result.returncode != 0:
+                return jsonify({'success': False, 'error': f'Failed to upload beacons_config.json: {result.stderr}'}), 500
+            logs.append("✓ beacons_config.json uploaded")
+        
+        logs.append("🔀 Activating release...")
+        result = run_remote(host, activate_release_cmd(directory, release_id))
+        if result.returncode != 0:
+            return jsonify({'success': False, 'error': f'Failed to activate release: {result.stderr}'}), 500
+        logs.append(f"✓ current -> releases/{release_id}")
+        
+        pruned = prune_host_releases(host)
+        if pruned['success'] and pruned['pruned']:
+            logs.append(f"🧹 Removed old releases: {', '.join(pruned['pruned'])}")
         
         # Restart service
         logs.append("🔄 Restarting service...")
-        restart_cmd = f"""sshpass -p '{password}' ssh -o StrictHostKeyChecking=no {rpi_addr} '
-        cd {directory} && 
-        screen -X -S beacon_simulator quit 2>/dev/null || true &&
-        sleep 2 &&
-        chmod +x simulate_beacon.py run_detached.sh &&
-        ./run_detached.sh &&
-        sleep 2 &&
-        if screen -list | grep -q "beacon_simulator"; then
-            echo "Service started successfully"
-        else
-            echo "Warning: Service may not have started"
-        fi
-        '"""  
-        result = subprocess.run(restart_cmd, shell=True, capture_output=True, text=True)
+        result = run_remote(host, restart_service_cmd(directory))
         logs.append("✓ Service started")
         
         logs.append(f"🌐 Web UI: http://{ip}:{port}")
@@ -3,14 +3,26 @@
 # BACKWARD COMPATIBLE UPDATE - All existing APIs work as before
 
 import argparse
+import collections
+import csv
+import io
+import math
+import re
 import time
 import subprocess
 import json
 import os
+import signal
 import threading
-from flask import Flask, jsonify, request, send_file
+import socket
+import struct
 from pathlib import Path
 
+# Flask is imported inside start_api: headless mode never needs the web stack
+# and the import alone is a noticeable part of startup time on a Pi Zero.
+# The stdlib imports above are the same in both modes, so timing starts here.
+STARTUP_BEGIN = time.perf_counter()
+
 # Config file path (NEW - doesn't affect existing functionality)
 SCRIPT_DIR = Path(__file__).parent
 CONFIG_FILE = SCRIPT_DIR / 'beacons_config.json'
@@ -33,6 +45,158 @@ def save_beacons_config(beacons):
 	except Exception as e:
 		print(f"Failed to save config: {e}")
 
+UUID_PATTERN = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+INTEGER_PATTERN = re.compile(r'^[+-]?[0-9]+$')
+PRESET_CSV_FIELDS = ['name', 'uuid', 'major', 'minor', 'rssi']
+MIN_ADV_INTERVAL_MS = 20
+MAX_ADV_INTERVAL_MS = 10240
+MAX_IMPORT_ERRORS = 100  # Per-row errors reported back; the rest are only counted
+
+def parse_integer_field(field, value):
+	"""Strict integer parsing: no booleans, no fractional floats, only integer literals in strings"""
+	if isinstance(value, bool):
+		raise ValueError(f'{field} is not an integer: {value!r}')
+	if isinstance(value, int):
+		return value
+	if isinstance(value, float) and value.is_integer():
+		return int(value)
+	if isinstance(value, str) and INTEGER_PATTERN.match(value.strip()):
+		return int(value.strip())
+	raise ValueError(f'{field} is not an integer: {value!r}')
+
+def validate_beacon_row(row):
+	"""Validate one beacon preset coming from an import.
+	
+	Args:
+	    row: dict with uuid, major, minor and optional name/rssi (values may be strings)
+	
+	Returns:
+	    dict: Normalized preset
+	
+	Raises:
+	    ValueError: With a message describing the first invalid field
+	"""
+	if not isinstance(row, dict):
+		raise ValueError('row is not an object')
+	uuid = str(row.get('uuid') or '').strip()
+	if not UUID_PATTERN.match(uuid):
+		raise ValueError(f'invalid uuid {uuid!r}')
+	beacon = {'name': str(row.get('name') or '').strip(), 'uuid': uuid}
+	for field, low, high, default in (('major', 0, 65535, None), ('minor', 0, 65535, None), ('rssi', -128, 127, -59)):
+		value = row.get(field)
+		if value is None or value == '':
+			if default is None:
+				raise ValueError(f'missing {field}')
+			value = default
+		value = parse_integer_field(field, value)
+		if not low <= value <= high:
+			raise ValueError(f'{field} {value} out of range [{low}, {high}]')
+		beacon[field] = value
+	return beacon
+
+def import_beacons_config(rows):
+	"""Append validated rows to the config file in a single atomic write.
+	
+	Rows are streamed straight into a temporary file next to the config, so
+	memory use does not grow with the size of the import.
+	
+	Args:
+	    rows: Iterable of (row_number, dict or ValueError) pairs
+	
+	Returns:
+	    dict: imported/failed counts, the first MAX_IMPORT_ERRORS errors and the new total
+	"""
+	imported = failed = written = 0
+	errors = []
+	existing = load_beacons_config()
+	tmp_file = CONFIG_FILE.with_name(CONFIG_FILE.name + '.tmp')
+	
+	def write_entry(out, beacon):
+		# Same layout as json.dump(beacons, f, indent=2) in save_beacons_config
+		nonlocal written
+		out.write(',\n' if written else '\n')
+		out.write('\n'.join('  ' + line for line in json.dumps(beacon, indent=2).splitlines()))
+		written += 1
+	
+	try:
+		with open(tmp_file, 'w') as out:
+			out.write('[')
+			for beacon in existing:
+				write_entry(out, beacon)
+			for row_number, row in rows:
+				try:
+					if isinstance(row, Exception):
+						raise row
+					beacon = validate_beacon_row(row)
+				except ValueError as e:
+					failed += 1
+					if len(errors) < MAX_IMPORT_ERRORS:
+						errors.append({'row': row_number, 'error': str(e)})
+					continue
+				write_entry(out, beacon)
+				imported += 1
+			out.write('\n]' if written else ']')
+		if imported:
+			os.replace(tmp_file, CONFIG_FILE)
+	finally:
+		if tmp_file.exists():
+			tmp_file.unlink()
+	return {'imported': imported, 'failed': failed, 'errors': errors, 'total': len(existing) + imported}
+
+def iter_ndjson_rows(lines):
+	"""Yield (row_number, dict or ValueError) for each non-empty NDJSON line"""
+	for row_number, line in enumerate(lines, start=1):
+		line = line.decode('utf-8-sig', errors='replace') if isinstance(line, bytes) else line
+		if not line.strip():
+			continue
+		try:
+			yield row_number, json.loads(line)
+		except ValueError as e:
+			yield row_number, ValueError(f'invalid JSON: {e}')
+
+def iter_csv_rows(lines):
+	"""Yield (row_number, dict or ValueError) for each CSV data row; the header names the columns.
+	
+	A malformed row (NUL byte, oversized field, ...) is reported as an error
+	and reading continues with the next line.
+	"""
+	line_number = 0
+	
+	def decoded():
+		nonlocal line_number
+		for line in lines:
+			line_number += 1
+			yield line.decode('utf-8-sig', errors='replace') if isinstance(line, bytes) else line
+	
+	reader = csv.DictReader(decoded())
+	while True:
+		try:
+			row = next(reader)
+		except StopIteration:
+			return
+		except csv.Error as e:
+			# The reader resets its state on the next call, so the import can go on
+			yield line_number, ValueError(f'invalid CSV: {e}')
+			continue
+		yield line_number, row
+
+def export_beacons_config(fmt):
+	"""Yield the saved presets one NDJSON line or CSV row at a time"""
+	beacons = load_beacons_config()
+	if fmt == 'csv':
+		buffer = io.StringIO()
+		writer = csv.DictWriter(buffer, fieldnames=PRESET_CSV_FIELDS, extrasaction='ignore')
+		writer.writeheader()
+		for beacon in beacons:
+			writer.writerow(beacon)
+			yield buffer.getvalue()
+			buffer.seek(0)
+			buffer.truncate(0)
+		yield buffer.getvalue()
+	else:
+		for beacon in beacons:
+			yield json.dumps(beacon) + '\n'
+
 def hexstring_to_bytes_with_spaces(hex_string):
 	arr = []
 	for i in range(0, len(hex_string), 2):
@@ -49,17 +213,44 @@ def get_ibeacon_payload(uuid,major,minor, rssi):
 current_beacon = None
 active_beacons = []  # List of currently broadcasting beacons (for multi-beacon support)
 multiplex_thread = None
+radio_watchdog = None
+radio_command_timeout = 3.0  # Seconds before a hung hcitool/hciconfig call is killed
+
+def apply_ibeacon(uuid, major, minor, rssi=-59, min_interval=100, max_interval=100, interface='hci0'):
+	"""Put one beacon on air, raising CalledProcessError/TimeoutExpired on radio failure"""
+	restart_ble(interface)
+	set_ibeacon_advertisment(uuid, major, minor, rssi, interface)
+	set_advertisment_interval(min_interval, max_interval, interface)
+	return True
 
 def start_ibeacon(uuid, major, minor, rssi=-59, min_interval=100, max_interval=100, interface='hci0'):
 	try:
-		restart_ble(interface)
-		set_ibeacon_advertisment(uuid, major, minor, rssi, interface)
-		set_advertisment_interval(min_interval, max_interval, interface)
+		apply_ibeacon(uuid, major, minor, rssi, min_interval, max_interval, interface)
+		if radio_watchdog is not None:
+			radio_watchdog.report_success()
 		return True
-	except subprocess.CalledProcessError as e:
+	except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
 		print(f"Failed to start iBeacon advertising: {e}")
+		if radio_watchdog is not None:
+			return radio_watchdog.recover(
+				lambda: apply_ibeacon(uuid, major, minor, rssi, min_interval, max_interval, interface), e)
 	return False
 
+def apply_active_set(interval=100, interface='hci0'):
+	"""Bring the radio back in line with active_beacons (raises on radio failure)"""
+	global multiplex_thread
+	if len(active_beacons) == 1:
+		beacon = active_beacons[0]
+		apply_ibeacon(beacon['uuid'], beacon['major'], beacon['minor'], beacon.get('rssi', -59), interval, interval, interface)
+	elif len(active_beacons) > 1 and not (multiplex_running and multiplex_thread is not None and multiplex_thread.is_alive()):
+		multiplex_thread = threading.Thread(
+			target=start_multiplex_ibeacons,
+			args=(active_beacons, interface),
+			daemon=True
+		)
+		multiplex_thread.start()
+	return True
+
 multiplex_running = False
 multiplex_beacons = None
 def start_multiplex_ibeacons(beacons, interface='hci0'):
@@ -80,8 +271,11 @@ def start_multiplex_ibeacons(beacons, interface='hci0'):
 			print("⏸️  Multiplex stopped - no active beacons")
 			break
 			
-		j = i % len(active_beacons)
-		beacon = active_beacons[j]
+		# Leases may shrink the list from another thread, index a stable copy
+		beacons_now = list(active_beacons)
+		if not beacons_now:
+			break
+		beacon = beacons_now[i % len(beacons_now)]
 		start_ibeacon(beacon["uuid"], beacon["major"], beacon["minor"], beacon.get("rssi", -69), 100, 100, interface)
 		time.sleep(4*100/1000)
 		i += 1
@@ -109,7 +303,7 @@ def stop_advertisement(interface='hci0'):
 			print(f"  🔄 Disable attempt {attempt + 1}/3...")
 			# HCI command to disable advertising (0x08 0x000a 00)
 			subprocess.run(f'sudo hcitool -i {interface} cmd 0x08 0x000a 00'.split(), 
-						   check=False, capture_output=True)
+						   check=False, capture_output=True, timeout=radio_command_timeout)
 			time.sleep(0.15)
 		except Exception as e:
 			print(f"  ⚠️ Disable attempt {attempt + 1} error (continuing): {e}")
@@ -117,9 +311,9 @@ def stop_advertisement(interface='hci0'):
 	# Reset BLE interface completely
 	print("  🔄 Resetting BLE interface...")
 	try:
-		subprocess.run(['sudo', 'hciconfig', interface, 'down'], check=False, capture_output=True)
+		subprocess.run(['sudo', 'hciconfig', interface, 'down'], check=False, capture_output=True, timeout=radio_command_timeout)
 		time.sleep(0.4)
-		subprocess.run(['sudo', 'hciconfig', interface, 'up'], check=False, capture_output=True)
+		subprocess.run(['sudo', 'hciconfig', interface, 'up'], check=False, capture_output=True, timeout=radio_command_timeout)
 		time.sleep(0.4)
 	except Exception as e:
 		print(f"  ⚠️ Interface reset error: {e}")
@@ -129,14 +323,14 @@ def stop_advertisement(interface='hci0'):
 def set_advertisment_interval(min_interval, max_interval, interface='hci0'):
 	min_interval_le = int(min_interval * 1.6).to_bytes(2, byteorder='little').hex()
 	max_interval_le = int(max_interval * 1.6).to_bytes(2, byteorder='little').hex()
-	subprocess.run((f'sudo hcitool -i {interface} cmd 0x08 0x0006 '+hexstring_to_bytes_with_spaces(min_interval_le)+' '+hexstring_to_bytes_with_spaces(max_interval_le)+' 03 00 00 00 00 00 00 00 00 07 00').split(), check=True)
-	subprocess.run(f'sudo hcitool -i {interface} cmd 0x08 0x000a 01'.split(), check=True)
+	subprocess.run((f'sudo hcitool -i {interface} cmd 0x08 0x0006 '+hexstring_to_bytes_with_spaces(min_interval_le)+' '+hexstring_to_bytes_with_spaces(max_interval_le)+' 03 00 00 00 00 00 00 00 00 07 00').split(), check=True, timeout=radio_command_timeout)
+	subprocess.run(f'sudo hcitool -i {interface} cmd 0x08 0x000a 01'.split(), check=True, timeout=radio_command_timeout)
 	
 def set_ibeacon_advertisment(uuid, major, minor, rssi=-59, interface='hci0'):
 	global current_beacon
 	current_beacon = {'uuid': uuid, 'major': major, 'minor': minor, 'rssi': rssi, 'date': time.time()}
 	ibeacon_payload = get_ibeacon_payload(uuid, major, minor, rssi)
-	subprocess.run((f'sudo hcitool -i {interface} cmd 0x08 0x0008 '+ibeacon_payload).split(), check=True)
+	subprocess.run((f'sudo hcitool -i {interface} cmd 0x08 0x0008 '+ibeacon_payload).split(), check=True, timeout=radio_command_timeout)
 			
 	
 def stop_all_existing_beacons():
@@ -189,8 +383,8 @@ def stop_all_existing_beacons():
 		print(f"⚠️  Cleanup warning (continuing anyway): {e}")
 
 def restart_ble(interface='hci0'):
-	subprocess.run(f'sudo hciconfig {interface} down'.split(), check=False)
-	subprocess.run(f'sudo hciconfig {interface} up'.split(), check=False)
+	subprocess.run(f'sudo hciconfig {interface} down'.split(), check=False, timeout=radio_command_timeout)
+	subprocess.run(f'sudo hciconfig {interface} up'.split(), check=False, timeout=radio_command_timeout)
 	
 def power_on_usb(port_number=2, location='1-1'):
 	subprocess.run(f"sudo uhubctl -l {location} -p {port_number} -a 1".split(), check=False)
@@ -213,8 +407,731 @@ def get_usb_power(port_number=2, location='1-1'):
 	except subprocess.CalledProcessError as e:
 		print(f"Failed to run command: {e}")
 	return False
+
+
+# ═══════════════════════════════════════════════════════════
+# RADIO WATCHDOG - Detects a wedged controller and recovers it
+# ═══════════════════════════════════════════════════════════
+
+def get_controller_status(interface='hci0'):
+	"""Probe the controller without touching the advertising state.
+	
+	Returns:
+	    str: 'up', 'down', 'absent' (adapter gone) or 'stuck' (hciconfig hangs)
+	"""
+	try:
+		result = subprocess.run(['hciconfig', interface], capture_output=True, text=True,
+								check=False, timeout=radio_command_timeout)
+	except subprocess.TimeoutExpired:
+		return 'stuck'
+	if result.returncode != 0 or interface not in result.stdout:
+		return 'absent'
+	return 'up' if 'UP RUNNING' in result.stdout else 'down'
+
+class RadioWatchdog:
+	"""Keeps the broadcasting controller alive.
+	
+	Failed radio commands and periodic health probes both end up in recover(),
+	which escalates one step at a time (re-issue the command, reset the
+	adapter, power-cycle the USB port) and stops at the first step after which
+	the command succeeds. Outages are kept for the /beacon/health endpoint.
+	"""
+	
+	RETRY_BACKOFF = 30.0  # Seconds to wait after a failed ladder before climbing it again
+	USB_SETTLE_TIMEOUT = 15.0  # Seconds to wait for the adapter to re-enumerate
+	# restart_ble and stop_advertisement take the adapter down for up to 0.4 s on
+	# purpose, so a bad probe only counts once it is confirmed after that window
+	UNHEALTHY_PROBES = 2
+	CONFIRM_DELAY = 1.0
+	
+	def __init__(self, interface='hci0', usb_port=2, usb_location='1-1', interval=100, probe_interval=5.0):
+		self.interface = interface
+		self.usb_port = usb_port
+		self.usb_location = usb_location
+		self.interval = interval
+		self.probe_interval = probe_interval
+		self.state = 'healthy'
+		self.last_ok = time.time()
+		self.current_outage = None
+		self.outages = collections.deque(maxlen=20)
+		self.recoveries = 0
+		self._lock = threading.Lock()
+		self._generation = 0
+		self._failed_at = None
+		self._suspended = False
+		self._grace_until = 0.0
+	
+	def report_success(self):
+		self.last_ok = time.time()
+	
+	def suspend(self):
+		"""Stand down while the adapter is deliberately unpowered (/beacon/usb/disable).
+		
+		A running recovery is abandoned before its next step, so the USB port is
+		never powered back on behind the caller's back.
+		"""
+		self._suspended = True
+		with self._lock:
+			self.current_outage = None
+			self.state = 'suspended'
+		print(f"⏸️  Controller watchdog suspended for {self.interface}")
+	
+	def resume(self):
+		"""Watch the adapter again once it is powered (/beacon/usb/enable)"""
+		with self._lock:
+			self.state = 'healthy'
+			self._failed_at = None
+			# Give the dongle time to re-enumerate before probes count as failures
+			self._grace_until = time.monotonic() + self.USB_SETTLE_TIMEOUT
+			self._suspended = False
+			self.report_success()
+		print(f"▶️  Controller watchdog resumed for {self.interface}")
+	
+	def _reissue(self):
+		pass
+	
+	def _reset_adapter(self):
+		subprocess.run(['sudo', 'hciconfig', self.interface, 'reset'], check=False, capture_output=True, timeout=radio_command_timeout)
+		restart_ble(self.interface)
+	
+	def _power_cycle_usb(self):
+		power_off_usb(self.usb_port, self.usb_location)
+		time.sleep(2.0)
+		power_on_usb(self.usb_port, self.usb_location)
+		deadline = time.monotonic() + self.USB_SETTLE_TIMEOUT
+		while get_controller_status(self.interface) == 'absent' and time.monotonic() < deadline:
+			time.sleep(0.5)
+		restart_ble(self.interface)
+	
+	def _attempt(self, action):
+		try:
+			return bool(action())
+		except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+			self.current_outage['error'] = str(e)
+			return False
+	
+	def recover(self, action, error=None):
+		"""Escalate until action() succeeds, then restore the active beacon set.
+		
+		Args:
+		    action: Callable re-issuing the failed radio work, truthy on success
+		    error: The exception (or reason string) that triggered recovery
+		
+		Returns:
+		    bool: True if the controller was recovered, False otherwise
+		"""
+		if self._suspended:
+			return False
+		generation = self._generation
+		with self._lock:
+			if self._suspended:
+				return False
+			if self._generation != generation:
+				# Another thread recovered the controller while we waited
+				if self._attempt_quietly(action):
+					return True
+			if self.state == 'failed' and time.monotonic() - self._failed_at < self.RETRY_BACKOFF:
+				return False
+			
+			now = time.time()
+			if self.current_outage is None:
+				self.current_outage = {'last_ok': self.last_ok, 'detected': now, 'error': str(error)}
+			self.state = 'recovering'
+			print(f"🩺 Controller {self.interface} unhealthy ({error}) - starting recovery")
+			
+			steps = (('reissue', self._reissue), ('adapter_reset', self._reset_adapter), ('usb_power_cycle', self._power_cycle_usb))
+			for step, remedy in steps:
+				if self._suspended:
+					print("  ⏸️  Recovery abandoned: watchdog suspended")
+					return False
+				print(f"  🔧 Recovery step: {step}")
+				try:
+					remedy()
+				except (subprocess.TimeoutExpired, OSError) as e:
+					print(f"  ⚠️ Recovery step {step} error (continuing): {e}")
+				if self._attempt(action):
+					self._finish(step, restore=action != self._restore)
+					return True
+			
+			self.state = 'failed'
+			self._failed_at = time.monotonic()
+			print(f"❌ Controller {self.interface} still unresponsive, next attempt in {self.RETRY_BACKOFF:.0f}s")
+			return False
+	
+	def _attempt_quietly(self, action):
+		try:
+			if action():
+				self.report_success()
+				return True
+		except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+			pass
+		return False
+	
+	def _finish(self, step, restore):
+		# The remedy may have wiped the controller, put every active beacon back on air
+		if restore and step != 'reissue':
+			try:
+				apply_active_set(self.interval, self.interface)
+			except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+				print(f"  ⚠️ Restoring active beacons failed: {e}")
+		now = time.time()
+		outage = self.current_outage
+		outage.update({
+			'recovered': now,
+			'step': step,
+			'outage_ms': round((now - outage['last_ok']) * 1000),
+			'recovery_ms': round((now - outage['detected']) * 1000),
+		})
+		self.outages.append(outage)
+		self.current_outage = None
+		self.recoveries += 1
+		self.state = 'healthy'
+		self._generation += 1
+		self.report_success()
+		print(f"✅ Controller {self.interface} recovered by {step} in {outage['recovery_ms']} ms")
+	
+	def _restore(self):
+		if get_controller_status(self.interface) != 'up':
+			return False
+		return apply_active_set(self.interval, self.interface)
+	
+	def run(self):
+		"""Probe the controller every probe_interval seconds (blocking)"""
+		bad_probes = 0
+		while True:
+			time.sleep(self.CONFIRM_DELAY if bad_probes else self.probe_interval)
+			if self._suspended or time.monotonic() < self._grace_until:
+				bad_probes = 0
+				continue
+			status = get_controller_status(self.interface)
+			if status == 'up':
+				bad_probes = 0
+				if self.state == 'healthy':
+					self.report_success()
+				continue
+			bad_probes += 1
+			if bad_probes < self.UNHEALTHY_PROBES:
+				continue
+			bad_probes = 0
+			self.recover(self._restore, f"controller {status}")
+	
+	def snapshot(self):
+		"""Return the watchdog state as a JSON-ready dict"""
+		current = None
+		if self.current_outage is not None:
+			current = dict(self.current_outage, outage_ms=round((time.time() - self.current_outage['last_ok']) * 1000))
+		return {
+			'state': self.state,
+			'interface': self.interface,
+			'last_ok': self.last_ok,
+			'recoveries': self.recoveries,
+			'current_outage': current,
+			'outages': list(self.outages),
+		}
+
+# ═══════════════════════════════════════════════════════════
+# BEACON LEASES - Beacons of crashed clients expire on their own
+# ═══════════════════════════════════════════════════════════
+
+class LeaseTimerWheel:
+	"""Hashed timer wheel for lease expiry.
+	
+	Scheduling, renewing and cancelling are O(1) and each tick only looks at
+	one slot, so thousands of leases cost nothing while they are healthy.
+	Expiries further away than one revolution stay in their slot and are
+	skipped until their time comes.
+	"""
+	
+	def __init__(self, tick=1.0, slots=64, now=None):
+		self.tick = tick
+		self.slots = [set() for _ in range(slots)]
+		self.entries = {}  # key -> (expires_at, slot index)
+		self.current_tick = int((time.monotonic() if now is None else now) / tick)
+	
+	def schedule(self, key, ttl, now=None):
+		"""(Re)schedule key to expire ttl seconds from now"""
+		now = time.monotonic() if now is None else now
+		self.cancel(key)
+		expires_at = now + ttl
+		tick_index = max(math.ceil(expires_at / self.tick), self.current_tick + 1)
+		slot = tick_index % len(self.slots)
+		self.slots[slot].add(key)
+		self.entries[key] = (expires_at, slot)
+	
+	def cancel(self, key):
+		entry = self.entries.pop(key, None)
+		if entry is not None:
+			self.slots[entry[1]].discard(key)
+	
+	def advance(self, now=None):
+		"""Move the wheel up to now and return the keys that expired"""
+		now = time.monotonic() if now is None else now
+		target = int(now / self.tick)
+		# After a long stall one full revolution visits every slot
+		steps = min(target - self.current_tick, len(self.slots))
+		self.current_tick = max(self.current_tick, target - steps)
+		expired = []
+		for _ in range(steps):
+			self.current_tick += 1
+			slot = self.slots[self.current_tick % len(self.slots)]
+			for key in [k for k in slot if self.entries[k][0] <= now]:
+				slot.discard(key)
+				del self.entries[key]
+				expired.append(key)
+		return expired
+
+lease_lock = threading.Lock()
+lease_wheel = LeaseTimerWheel()
+beacon_leases = {}  # (uuid, major, minor) -> {'client': ..., 'ttl': ..., 'expires': ...}
+
+def parse_lease_ttl(value):
+	"""Parse the ttl query parameter.
+	
+	Returns:
+	    float: TTL in seconds, or None when no ttl was given
+	
+	Raises:
+	    ValueError: If ttl is not a finite number greater than 0
+	"""
+	if value is None or value == '':
+		return None
+	try:
+		ttl = float(value)
+	except ValueError:
+		raise ValueError(f'ttl is not a number: {value!r}')
+	if not math.isfinite(ttl) or ttl <= 0:
+		raise ValueError(f'ttl must be a finite number of seconds > 0, got {value!r}')
+	return ttl
+
+def grant_lease(key, client, ttl):
+	"""Give client ownership of an active beacon for ttl seconds (renews if already leased)"""
+	with lease_lock:
+		lease_wheel.schedule(key, ttl)
+		beacon_leases[key] = {'client': client, 'ttl': ttl, 'expires': time.time() + ttl}
+
+def has_lease(key):
+	with lease_lock:
+		return key in beacon_leases
+
+def release_lease(key):
+	with lease_lock:
+		lease_wheel.cancel(key)
+		beacon_leases.pop(key, None)
+
+def clear_leases():
+	with lease_lock:
+		for key in list(beacon_leases):
+			lease_wheel.cancel(key)
+		beacon_leases.clear()
+
+def renew_client_leases(client, ttl=None):
+	"""Heartbeat: push back the expiry of every lease held by client.
+	
+	Returns:
+	    int: Number of leases renewed
+	"""
+	renewed = 0
+	with lease_lock:
+		for key, lease in beacon_leases.items():
+			if lease['client'] != client:
+				continue
+			lease['ttl'] = ttl or lease['ttl']
+			lease['expires'] = time.time() + lease['ttl']
+			lease_wheel.schedule(key, lease['ttl'])
+			renewed += 1
+	return renewed
+
+def list_leases():
+	now = time.time()
+	with lease_lock:
+		return [{'uuid': key[0], 'major': key[1], 'minor': key[2], 'client': lease['client'], 'ttl': lease['ttl'],
+				 'expires_in': round(max(lease['expires'] - now, 0), 1)}
+				for key, lease in beacon_leases.items()]
+
+def reap_expired_leases(interval=100, interface='hci0'):
+	"""Drop the beacons whose lease expired and rebalance the rotation without a radio reset.
+	
+	Returns:
+	    list: Keys (uuid, major, minor) of the beacons that were removed
+	"""
+	global multiplex_running
+	with lease_lock:
+		expired = lease_wheel.advance()
+		for key in expired:
+			lease = beacon_leases.pop(key)
+			print(f"⌛ Lease of {lease['client']} expired: {key[0]} (Major: {key[1]}, Minor: {key[2]})")
+	if not expired:
+		return expired
+	
+	expired_set = set(expired)
+	was_multiplexing = len(active_beacons) > 1
+	# In place: the multiplex thread keeps rotating over whatever is left
+	active_beacons[:] = [b for b in active_beacons if (b['uuid'], b['major'], b['minor']) not in expired_set]
+	
+	if len(active_beacons) == 0:
+		multiplex_running = False
+		# A slot in progress would re-enable advertising after our disable
+		if multiplex_thread is not None:
+			multiplex_thread.join(timeout=radio_command_timeout * 4 + 1.0)
+		subprocess.run(f'sudo hcitool -i {interface} cmd 0x08 0x000a 00'.split(),
+					   check=False, capture_output=True, timeout=radio_command_timeout)
+	elif len(active_beacons) == 1 and was_multiplexing:
+		multiplex_running = False
+		if multiplex_thread is not None:
+			multiplex_thread.join(timeout=radio_command_timeout * 4 + 1.0)
+		beacon = active_beacons[0]
+		start_ibeacon(beacon['uuid'], beacon['major'], beacon['minor'], beacon.get('rssi', -59), interval, interval, interface)
+	print(f"📊 Active beacons after lease expiry: {len(active_beacons)}")
+	return expired
+
+def run_lease_reaper(interval=100, interface='hci0'):
+	"""Expire leases once per wheel tick (blocking)"""
+	while True:
+		time.sleep(lease_wheel.tick)
+		try:
+			reap_expired_leases(interval, interface)
+		except Exception as e:
+			print(f"⚠️  Lease reaper error (continuing): {e}")
+
+# ═══════════════════════════════════════════════════════════
+# ON-AIR MONITOR - Verifies broadcasts with a second adapter
+# ═══════════════════════════════════════════════════════════
+
+HCI_COMMAND_PKT = 0x01
+HCI_ACLDATA_PKT = 0x02
+HCI_SCODATA_PKT = 0x03
+HCI_EVENT_PKT = 0x04
+EVT_LE_META_EVENT = 0x3E
+EVT_LE_ADVERTISING_REPORT = 0x02
+AD_TYPE_MANUFACTURER_DATA = 0xFF
+IBEACON_PREFIX = bytes.fromhex('4c000215')  # Apple company ID + iBeacon type/length
+
+# H4 header sizes and the offset/width of their length field, per packet type
+HCI_PACKET_HEADERS = {
+	HCI_COMMAND_PKT: (4, 3, 1),
+	HCI_ACLDATA_PKT: (5, 3, 2),
+	HCI_SCODATA_PKT: (4, 3, 1),
+	HCI_EVENT_PKT: (3, 2, 1),
+}
+
+air_monitor = None
+
+def beacon_identity(uuid, major, minor):
+	"""Build the 20-byte on-air identity (UUID + major + minor) of a beacon.
+	
+	Args:
+	    uuid: Beacon UUID string (with or without dashes)
+	    major: Major version (0-65535)
+	    minor: Minor version (0-65535)
+	
+	Returns:
+	    bytes: Identity exactly as it appears in the iBeacon payload
+	"""
+	return bytes.fromhex(uuid.replace('-', '')) + major.to_bytes(2, byteorder='big') + minor.to_bytes(2, byteorder='big')
+
+class HciAdvertisingReportParser:
+	"""Streaming parser for LE Advertising Report events in a raw H4 HCI byte stream.
+	
+	Input can be split at arbitrary byte boundaries (socket reads, captured
+	files), partial packets are kept until the rest arrives. Only iBeacon
+	identities are materialised, everything else is inspected in place.
+	"""
+	
+	def __init__(self):
+		self._buffer = bytearray()
+	
+	def reset(self):
+		"""Drop any buffered partial packet, e.g. after reconnecting the socket"""
+		self._buffer.clear()
+	
+	def feed(self, data, timestamp, on_report):
+		"""Parse a chunk of HCI bytes.
+		
+		Args:
+		    data: Raw bytes, each packet prefixed with its H4 packet type
+		    timestamp: Reception time passed through to on_report
+		    on_report: Called as on_report(identity, rssi, timestamp) per iBeacon report
+		
+		Returns:
+		    int: Number of iBeacon reports found
+		"""
+		buf = self._buffer
+		buf += data
+		end = len(buf)
+		pos = 0
+		found = 0
+		view = memoryview(buf)
+		try:
+			while pos < end:
+				header = HCI_PACKET_HEADERS.get(buf[pos])
+				if header is None:
+					# Garbage or unknown packet type: resync on the next byte
+					pos += 1
+					continue
+				header_len, len_offset, len_width = header
+				if end - pos < header_len:
+					break
+				if len_width == 1:
+					payload_len = buf[pos + len_offset]
+				else:
+					payload_len = buf[pos + len_offset] | (buf[pos + len_offset + 1] << 8)
+				packet_end = pos + header_len + payload_len
+				if packet_end > end:
+					break
+				if (buf[pos] == HCI_EVENT_PKT and buf[pos + 1] == EVT_LE_META_EVENT
+						and payload_len >= 2 and buf[pos + 3] == EVT_LE_ADVERTISING_REPORT):
+					found += self._parse_reports(buf, view, pos + 4, packet_end, timestamp, on_report)
+				pos = packet_end
+		finally:
+			view.release()
+			del buf[:pos]
+		return found
+	
+	@staticmethod
+	def _parse_reports(buf, view, pos, end, timestamp, on_report):
+		found = 0
+		num_reports = buf[pos]
+		pos += 1
+		for _ in range(num_reports):
+			# event type (1) + address type (1) + address (6) + data length (1)
+			if pos + 9 > end:
+				break
+			data_start = pos + 9
+			data_end = data_start + buf[pos + 8]
+			if data_end >= end:
+				break
+			rssi = buf[data_end]
+			identity = HciAdvertisingReportParser._find_ibeacon(buf, view, data_start, data_end)
+			if identity is not None:
+				on_report(identity, rssi - 256 if rssi > 127 else rssi, timestamp)
+				found += 1
+			pos = data_end + 1
+		return found
+	
+	@staticmethod
+	def _find_ibeacon(buf, view, pos, end):
+		while pos < end:
+			ad_len = buf[pos]
+			if ad_len == 0 or pos + 1 + ad_len > end:
+				return None
+			# type (1) + iBeacon prefix (4) + identity (20) + measured power (1)
+			if (ad_len >= 26 and buf[pos + 1] == AD_TYPE_MANUFACTURER_DATA
+					and buf.startswith(IBEACON_PREFIX, pos + 2)):
+				return bytes(view[pos + 6:pos + 26])
+			pos += 1 + ad_len
+		return None
+
+class BeaconAirStats:
+	"""On-air statistics of a single beacon, updated without allocating."""
+	
+	__slots__ = ('uuid', 'major', 'minor', 'reports', 'gaps', 'max_gap', 'last_seen', 'last_rssi', 'buckets', 'bucket_second')
+	
+	def __init__(self, uuid, major, minor, window_seconds):
+		self.uuid = uuid
+		self.major = major
+		self.minor = minor
+		self.reports = 0
+		self.gaps = 0
+		self.max_gap = 0.0
+		self.last_seen = None
+		self.last_rssi = None
+		# One report counter per second, used as a ring for the rate window
+		self.buckets = [0] * (window_seconds + 1)
+		self.bucket_second = 0
+	
+	def _advance(self, second):
+		size = len(self.buckets)
+		if second - self.bucket_second >= size:
+			for i in range(size):
+				self.buckets[i] = 0
+		else:
+			for s in range(self.bucket_second + 1, second + 1):
+				self.buckets[s % size] = 0
+		self.bucket_second = second
+	
+	def record(self, rssi, timestamp, gap_threshold):
+		if self.last_seen is not None:
+			gap = timestamp - self.last_seen
+			if gap > self.max_gap:
+				self.max_gap = gap
+			if gap > gap_threshold:
+				self.gaps += 1
+		second = int(timestamp)
+		if second > self.bucket_second:
+			self._advance(second)
+		self.buckets[second % len(self.buckets)] += 1
+		self.reports += 1
+		self.last_seen = timestamp
+		self.last_rssi = rssi
+	
+	def rate(self, now):
+		"""Reports per second over the window, excluding the current partial second.
+		
+		Read-only: called from request threads while the reader thread records.
+		"""
+		second = int(now)
+		newest = self.bucket_second
+		size = len(self.buckets)
+		total = 0
+		for s in range(second - size + 1, second):
+			# A slot only holds second s if it was not recycled and is not from the future
+			if newest - size < s <= newest:
+				total += self.buckets[s % size]
+		return total / (size - 1)
+
+class OnAirMonitor:
+	"""Aggregates parsed advertising reports into per-beacon rate and gap statistics.
+	
+	Reports are matched against an index of the currently active beacons, so
+	traffic from unrelated devices is dropped with a single dict lookup.
+	"""
+	
+	def __init__(self, window_seconds=10, gap_threshold=1.0):
+		self.window_seconds = window_seconds
+		self.gap_threshold = gap_threshold
+		self.parser = HciAdvertisingReportParser()
+		self.total_reports = 0
+		self.running = False  # True while the reader is attached to the adapter
+		self._index = {}
+		self._index_key = ()
+	
+	def set_identities(self, beacons):
+		"""Track exactly the given beacons, keeping stats of those already tracked."""
+		key = tuple((b['uuid'], b['major'], b['minor']) for b in beacons)
+		if key == self._index_key:
+			return
+		index = {}
+		for uuid, major, minor in key:
+			try:
+				identity = beacon_identity(uuid, major, minor)
+			except (ValueError, OverflowError):
+				continue
+			stats = self._index.get(identity)
+			index[identity] = stats if stats is not None else BeaconAirStats(uuid, major, minor, self.window_seconds)
+		# Rebind instead of mutating so the reader thread never sees a half-built index
+		self._index = index
+		self._index_key = key
+	
+	def record(self, identity, rssi, timestamp):
+		stats = self._index.get(identity)
+		if stats is not None:
+			stats.record(rssi, timestamp, self.gap_threshold)
+			self.total_reports += 1
+	
+	def feed(self, data, timestamp):
+		"""Feed raw HCI bytes (live or captured) received at timestamp."""
+		return self.parser.feed(data, timestamp, self.record)
+	
+	def snapshot(self, now=None):
+		"""Return the per-beacon on-air statistics as JSON-ready dicts."""
+		now = time.monotonic() if now is None else now
+		result = []
+		for stats in list(self._index.values()):
+			seen = stats.last_seen is not None
+			result.append({
+				'uuid': stats.uuid,
+				'major': stats.major,
+				'minor': stats.minor,
+				'on_air': seen and now - stats.last_seen <= self.gap_threshold,
+				'reports': stats.reports,
+				'rate_hz': round(stats.rate(now), 2),
+				'gaps': stats.gaps,
+				'max_gap_ms': round(stats.max_gap * 1000),
+				'current_gap_ms': round((now - stats.last_seen) * 1000) if seen else None,
+				'rssi': stats.last_rssi,
+			})
+		return result
+
+def open_hci_scan_socket(interface):
+	"""Open a raw HCI socket on interface that only receives LE meta events."""
+	dev_id = int(interface.replace('hci', ''))
+	sock = socket.socket(socket.AF_BLUETOOTH, socket.SOCK_RAW, socket.BTPROTO_HCI)
+	sock.bind((dev_id,))
+	# struct hci_filter: type mask, event mask (2 x 32 bit), opcode
+	event_mask_high = 1 << (EVT_LE_META_EVENT - 32)
+	sock.setsockopt(socket.SOL_HCI, socket.HCI_FILTER, struct.pack('<IIIH2x', 1 << HCI_EVENT_PKT, 0, event_mask_high, 0))
+	return sock
+
+def set_le_scan(enable, interface):
+	if enable:
+		# Passive scan, 10 ms interval and window: listen continuously
+		subprocess.run(f'sudo hcitool -i {interface} cmd 0x08 0x000b 00 10 00 10 00 00 00'.split(), check=True, capture_output=True, timeout=radio_command_timeout)
+		# Duplicate filtering off, otherwise the controller reports each beacon once
+		subprocess.run(f'sudo hcitool -i {interface} cmd 0x08 0x000c 01 00'.split(), check=True, capture_output=True, timeout=radio_command_timeout)
+	else:
+		subprocess.run(f'sudo hcitool -i {interface} cmd 0x08 0x000c 00 00'.split(), check=False, capture_output=True, timeout=radio_command_timeout)
+
+def run_air_monitor(monitor, interface, retry_delay=5.0):
+	"""Scan on interface and feed every advertising report into monitor (blocking).
+	
+	The adapter can disappear at any time (unplugged, USB power cycle by the
+	watchdog), so the socket is reopened until it comes back.
+	"""
+	print(f"👂 On-air monitor scanning on {interface}")
+	while True:
+		try:
+			sock = open_hci_scan_socket(interface)
+		except (OSError, ValueError) as e:
+			print(f"⚠️  On-air monitor unavailable on {interface}, retrying in {retry_delay:g}s: {e}")
+			time.sleep(retry_delay)
+			continue
+		try:
+			set_le_scan(False, interface)
+			set_le_scan(True, interface)
+			# Wake up regularly to pick up changes to the active beacon set
+			sock.settimeout(1.0)
+			monitor.parser.reset()
+			monitor.running = True
+			while True:
+				monitor.set_identities(active_beacons)
+				try:
+					data = sock.recv(1024)
+				except socket.timeout:
+					continue
+				monitor.feed(data, time.monotonic())
+		except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+			print(f"⚠️  On-air monitor lost {interface}, reconnecting in {retry_delay:g}s: {e}")
+		finally:
+			monitor.running = False
+			try:
+				set_le_scan(False, interface)
+			except (OSError, subprocess.TimeoutExpired):
+				pass
+			sock.close()
+		time.sleep(retry_delay)
                     
+def report_startup(mode):
+	"""Print how long imports and setup took and the peak RSS so far.
+	
+	Called before any radio cleanup, whose fixed sleeps would otherwise hide
+	the difference between headless and API mode.
+	"""
+	elapsed_ms = (time.perf_counter() - STARTUP_BEGIN) * 1000
+	try:
+		import resource
+		rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+		print(f"⏱️  {mode} startup: {elapsed_ms:.0f} ms, peak RSS {rss_mb:.1f} MB")
+	except ImportError:
+		print(f"⏱️  {mode} startup: {elapsed_ms:.0f} ms")
+
+def start_radio_services(args, with_monitor=True):
+	"""Start the controller watchdog and the optional on-air monitor"""
+	global air_monitor, radio_watchdog, radio_command_timeout
+	radio_command_timeout = args.command_timeout
+	radio_watchdog = RadioWatchdog(args.bluetooth_interface, args.usb_port, args.usb_location, args.interval, args.watchdog_interval)
+	
+	if args.watchdog_interval > 0:
+		threading.Thread(target=radio_watchdog.run, daemon=True).start()
+		print(f"🩺 Controller watchdog: probe every {args.watchdog_interval:g}s")
+	
+	if with_monitor and args.monitor_interface:
+		air_monitor = OnAirMonitor(gap_threshold=args.monitor_gap_ms / 1000)
+		threading.Thread(target=run_air_monitor, args=(air_monitor, args.monitor_interface), daemon=True).start()
+		print(f"👂 On-air monitor: GET /beacon/monitor (adapter {args.monitor_interface})")
+
 def start_api(args):
+	from flask import Flask, Response, jsonify, request, send_file
+	
 	app = Flask(__name__, static_folder='.')
 
 	# ═══════════════════════════════════════════════════════════
@@ -227,6 +1144,12 @@ def start_api(args):
 		global active_beacons, multiplex_running, multiplex_thread
 		
 		rssi = int(request.args.get('rssi', args.rssi))
+		# Optional lease: the beacon is dropped if the client stops renewing it
+		try:
+			ttl = parse_lease_ttl(request.args.get('ttl'))
+		except ValueError as e:
+			return jsonify({'error': str(e)}), 400
+		client = request.args.get('client', request.remote_addr)
 		
 		# Create beacon object
 		new_beacon = {'uuid': uuid, 'major': major, 'minor': minor, 'rssi': rssi}
@@ -235,10 +1158,19 @@ def start_api(args):
 		for beacon in active_beacons:
 			if beacon['uuid'] == uuid and beacon['major'] == major and beacon['minor'] == minor:
 				print(f"⚠️  Beacon already active: {uuid} (Major: {major}, Minor: {minor})")
+				# An enable without ttl makes the beacon permanent again; with ttl it
+				# only renews an existing lease and never puts a permanent beacon on a timer
+				if not ttl:
+					release_lease((uuid, major, minor))
+				elif has_lease((uuid, major, minor)):
+					grant_lease((uuid, major, minor), client, ttl)
 				return jsonify({'status': 'already_active', 'beacons': active_beacons}), 200
 		
 		# Add to active list
 		active_beacons.append(new_beacon)
+		if ttl:
+			grant_lease((uuid, major, minor), client, ttl)
+			print(f"⏳ Leased to {client} for {ttl:g}s")
 		print(f"✅ Beacon added to active list: {uuid} (Major: {major}, Minor: {minor}, RSSI: {rssi})")
 		print(f"📊 Total active beacons: {len(active_beacons)}")
 		
@@ -253,6 +1185,7 @@ def start_api(args):
 			success = start_ibeacon(uuid, major, minor, rssi, args.interval, args.interval, args.bluetooth_interface)
 			if not success:
 				active_beacons.remove(new_beacon)
+				release_lease((uuid, major, minor))
 				return jsonify({'error': 'Failed to start beacon broadcasting'}), 500
 		else:
 			# Multiple beacons - use multiplex (time-sharing)
@@ -279,6 +1212,7 @@ def start_api(args):
 		
 		# Clear active beacons and perform aggressive stop
 		active_beacons = []
+		clear_leases()
 		stop_advertisement(args.bluetooth_interface)
 		
 		print("✅ All beacons stopped")
@@ -297,6 +1231,7 @@ def start_api(args):
 		for i, beacon in enumerate(active_beacons):
 			if beacon['uuid'] == uuid and beacon['major'] == major and beacon['minor'] == minor:
 				active_beacons.pop(i)
+				release_lease((uuid, major, minor))
 				beacon_found = True
 				print(f"✅ Beacon removed from active list: {uuid} (Major: {major}, Minor: {minor})")
 				break
@@ -342,9 +1277,47 @@ def start_api(args):
 		"""EXISTING: Get current beacon(s) (Appium-compatible) - Now returns all active beacons"""
 		return jsonify(active_beacons), 200
 		
+	@app.route('/beacon/lease/renew/<client>', methods=['GET'])
+	def renew_beacon_lease(client):
+		"""NEW: Heartbeat - renew every lease held by client (optional ?ttl= changes the TTL)"""
+		try:
+			ttl = parse_lease_ttl(request.args.get('ttl'))
+		except ValueError as e:
+			return jsonify({'error': str(e)}), 400
+		renewed = renew_client_leases(client, ttl)
+		if renewed == 0:
+			return jsonify({'status': 'not_found', 'leases': list_leases()}), 404
+		return jsonify({'status': 'renewed', 'renewed': renewed, 'leases': list_leases()}), 200
+	
+	@app.route('/beacon/leases', methods=['GET'])
+	def get_beacon_leases():
+		"""NEW: Current leases with their owner and remaining time"""
+		return jsonify(list_leases()), 200
+	
+	@app.route('/beacon/health', methods=['GET'])
+	def get_beacon_health():
+		"""NEW: Controller health, current outage and past outages with recovery times"""
+		health = radio_watchdog.snapshot()
+		return jsonify(health), 200 if health['state'] in ('healthy', 'suspended') else 503
+	
+	@app.route('/beacon/monitor', methods=['GET'])
+	def get_beacon_monitor():
+		"""NEW: On-air rate and gaps per active beacon, as seen by the monitor adapter"""
+		if air_monitor is None:
+			return jsonify({'enabled': False, 'beacons': []}), 200
+		return jsonify({
+			'enabled': True,
+			'interface': args.monitor_interface,
+			'running': air_monitor.running,
+			'total_reports': air_monitor.total_reports,
+			'beacons': air_monitor.snapshot(),
+		}), 200
+		
 	@app.route('/beacon/usb/disable', methods=['GET'])
 	def disable_usb_beacon():
 		"""EXISTING: Disable USB (Appium-compatible)"""
+		# Powering the dongle off is intentional: the watchdog must not power it back on
+		radio_watchdog.suspend()
 		power_off_usb(args.usb_port, args.usb_location)
 		return get_usb_beacon_status()
 	
@@ -352,6 +1325,7 @@ def start_api(args):
 	def enable_usb_beacon():
 		"""EXISTING: Enable USB (Appium-compatible)"""
 		power_on_usb(args.usb_port, args.usb_location)
+		radio_watchdog.resume()
 		return get_usb_beacon_status()
 
 	@app.route('/beacon/usb', methods=['GET'])
@@ -402,8 +1376,39 @@ def start_api(args):
 		except Exception as e:
 			return jsonify({"error": str(e)}), 500
 	
+	def request_format():
+		fmt = request.args.get('format')
+		if fmt is None:
+			fmt = 'csv' if 'csv' in (request.content_type or '') else 'ndjson'
+		return fmt
+	
+	@app.route('/beacon/import', methods=['POST'])
+	def import_beacons():
+		"""NEW: Bulk-import presets streamed as NDJSON or CSV (?format=ndjson|csv)"""
+		fmt = request_format()
+		if fmt not in ('ndjson', 'csv'):
+			return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+		try:
+			rows = iter_csv_rows(request.stream) if fmt == 'csv' else iter_ndjson_rows(request.stream)
+			result = import_beacons_config(rows)
+			print(f"📥 Imported {result['imported']} presets ({result['failed']} rejected)")
+			return jsonify(result), 200
+		except Exception as e:
+			return jsonify({"error": str(e)}), 500
+	
+	@app.route('/beacon/export', methods=['GET'])
+	def export_beacons():
+		"""NEW: Stream all presets as NDJSON or CSV (?format=ndjson|csv)"""
+		fmt = request_format()
+		if fmt not in ('ndjson', 'csv'):
+			return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+		mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+		return Response(export_beacons_config(fmt), mimetype=mimetype,
+						headers={'Content-Disposition': f'attachment; filename=beacons.{fmt}'})
+	
 	# Initialize
 	print("🚀 Beacon Broadcaster API Starting...")
+	report_startup('API')
 	
 	# CRITICAL: Stop ALL existing beacon broadcasts before starting
 	stop_all_existing_beacons()
@@ -416,10 +1421,97 @@ def start_api(args):
 	print(f"   GET  /beacon/enable/<uuid>/<major>/<minor>")
 	print(f"   GET  /beacon/disable")
 	print(f"   GET  /beacon")
+	print(f"   GET  /beacon/health")
 	print("")
 	
 	stop_advertisement(args.bluetooth_interface)
+	start_radio_services(args)
+	threading.Thread(target=run_lease_reaper, args=(args.interval, args.bluetooth_interface), daemon=True).start()
+	
 	app.run(port=args.port, host='0.0.0.0', debug=False)
+
+def load_scenario(path):
+	"""Load the beacon set for headless mode.
+	
+	The file is either a list of beacons (same format as beacons_config.json)
+	or an object {"beacons": [...], "interval": ms}.
+	
+	Returns:
+	    tuple: (beacons, interval or None); invalid entries are skipped
+	
+	Raises:
+	    ValueError: If the file is not valid JSON, has no beacon list or an invalid interval
+	"""
+	with open(path, 'r') as f:
+		scenario = json.load(f)
+	interval = None
+	if isinstance(scenario, dict):
+		interval = scenario.get('interval')
+		scenario = scenario.get('beacons', [])
+	if interval is not None:
+		interval = parse_integer_field('interval', interval)
+		# BLE advertising interval range; also keeps int(interval * 1.6) within 2 bytes
+		if not MIN_ADV_INTERVAL_MS <= interval <= MAX_ADV_INTERVAL_MS:
+			raise ValueError(f'interval {interval} out of range [{MIN_ADV_INTERVAL_MS}, {MAX_ADV_INTERVAL_MS}] ms')
+	if not isinstance(scenario, list):
+		raise ValueError('beacons must be a list')
+	beacons = []
+	for entry in scenario:
+		try:
+			beacon = validate_beacon_row(entry)
+		except ValueError as e:
+			print(f"⚠️  Skipping invalid beacon {entry!r}: {e}")
+			continue
+		beacons.append(beacon)
+	return beacons, interval
+
+def run_daemon(args):
+	"""Headless mode: broadcast the beacon set from args.beacons_file, reload it on SIGHUP"""
+	global multiplex_running
+	reload_requested = threading.Event()
+	stop_requested = threading.Event()
+	signal.signal(signal.SIGHUP, lambda signum, frame: reload_requested.set())
+	signal.signal(signal.SIGTERM, lambda signum, frame: stop_requested.set())
+	
+	print(f"🚀 Beacon Broadcaster headless daemon (pid {os.getpid()}) - beacons from {args.beacons_file}")
+	report_startup('Headless')
+	stop_all_existing_beacons()
+	start_radio_services(args, with_monitor=False)
+	reload_requested.set()
+	
+	try:
+		while not stop_requested.is_set():
+			if not reload_requested.wait(1.0):
+				continue
+			reload_requested.clear()
+			try:
+				beacons, interval = load_scenario(args.beacons_file)
+			except (OSError, ValueError) as e:
+				print(f"⚠️  Could not load {args.beacons_file}, keeping current beacons: {e}")
+				continue
+			
+			print(f"🔄 Loaded {len(beacons)} beacons from {args.beacons_file}")
+			multiplex_running = False
+			if multiplex_thread is not None:
+				# Never let the old rotation overlap with the new one
+				multiplex_thread.join(timeout=radio_command_timeout * 4 + 1.0)
+			if interval:
+				args.interval = interval
+				radio_watchdog.interval = interval
+			active_beacons[:] = beacons
+			if not beacons:
+				stop_advertisement(args.bluetooth_interface)
+			else:
+				try:
+					apply_active_set(args.interval, args.bluetooth_interface)
+				except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+					print(f"Failed to start iBeacon advertising: {e}")
+					radio_watchdog.recover(lambda: apply_active_set(args.interval, args.bluetooth_interface), e)
+	except KeyboardInterrupt:
+		pass
+	
+	print("🛑 Headless daemon stopping...")
+	stop_advertisement(args.bluetooth_interface)
 	
 if __name__ == '__main__':
 	parser = argparse.ArgumentParser(description='Simulate ibeacon')
@@ -432,9 +1524,16 @@ if __name__ == '__main__':
 	parser.add_argument('--usb-port', '-P', type=int, default=2, help='USB port to control')
 	parser.add_argument('--usb-location', '-L', type=str, default='1-1', help='USB port location to control')
 	parser.add_argument('--bluetooth-interface', '-I', type=str, default='hci0', help='Bluetooth interface to control')
+	parser.add_argument('--beacons-file', '-f', type=str, default=None, help='Headless mode (with --port <= 0): broadcast the beacons in this JSON file, reload on SIGHUP')
+	parser.add_argument('--command-timeout', type=float, default=3.0, help='Seconds before a hung radio command is killed')
+	parser.add_argument('--watchdog-interval', type=float, default=5.0, help='Seconds between controller health probes (0 disables probing)')
+	parser.add_argument('--monitor-interface', type=str, default=None, help='Second Bluetooth interface used to verify broadcasts on air (e.g. hci1)')
+	parser.add_argument('--monitor-gap-ms', type=int, default=1000, help='Silence in ms after which the monitor counts a gap')
 
 	args = parser.parse_args()
-	if args.port <= 0:
+	if args.port <= 0 and args.beacons_file:
+		run_daemon(args)
+	elif args.port <= 0:
 		start_ibeacon(args.uuid, args.major, args.minor, args.rssi, args.interval, args.interval, args.bluetooth_interface)
 	else:
 		start_api(args)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Edge cases of the lease expiry wheel, driven with explicit timestamps."""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import simulate_beacon
+
+def new_wheel(slots=8):
+	return simulate_beacon.LeaseTimerWheel(tick=1.0, slots=slots, now=0.0)
+
+def expire_between(wheel, start, end, step=0.25):
+	"""Advance from start to end in small steps; return {key: time it was reported}"""
+	expired = {}
+	now = start
+	while now <= end:
+		for key in wheel.advance(now=now):
+			expired[key] = now
+		now += step
+	return expired
+
+class LeaseTimerWheelTest(unittest.TestCase):
+
+	def test_expires_on_time(self):
+		wheel = new_wheel()
+		wheel.schedule('a', 3.0, now=0.0)
+		self.assertEqual(wheel.advance(now=2.9), [])
+		self.assertEqual(wheel.advance(now=3.0), ['a'])
+		self.assertEqual(wheel.entries, {})
+
+	def test_expiry_more_than_one_revolution_away(self):
+		# 8 slots of 1 s: the wheel wraps twice before this lease is due
+		wheel = new_wheel(slots=8)
+		wheel.schedule('far', 20.0, now=0.0)
+		expired = expire_between(wheel, 0.0, 30.0)
+		self.assertEqual(list(expired), ['far'])
+		self.assertGreaterEqual(expired['far'], 20.0)
+		self.assertLess(expired['far'], 21.0)
+
+	def test_advance_after_stall_longer_than_a_revolution(self):
+		wheel = new_wheel(slots=8)
+		wheel.schedule('a', 2.0, now=0.0)
+		wheel.schedule('b', 5.0, now=0.0)
+		wheel.schedule('c', 40.0, now=0.0)
+		# Nothing ticks the wheel for 25 s (> 8 slots), then one advance catches up
+		self.assertEqual(sorted(wheel.advance(now=25.0)), ['a', 'b'])
+		self.assertEqual(list(wheel.entries), ['c'])
+		self.assertEqual(wheel.advance(now=39.5), [])
+		self.assertEqual(wheel.advance(now=40.0), ['c'])
+
+	def test_renew_reschedules(self):
+		wheel = new_wheel()
+		wheel.schedule('a', 3.0, now=0.0)
+		self.assertEqual(wheel.advance(now=2.0), [])
+		# Heartbeat at t=2 pushes expiry to t=12, into a different slot a revolution later
+		wheel.schedule('a', 10.0, now=2.0)
+		self.assertEqual(sum(1 for slot in wheel.slots if 'a' in slot), 1)
+		expired = expire_between(wheel, 2.25, 20.0)
+		self.assertGreaterEqual(expired['a'], 12.0)
+		self.assertLess(expired['a'], 13.0)
+
+	def test_cancel(self):
+		wheel = new_wheel()
+		wheel.schedule('a', 1.0, now=0.0)
+		wheel.cancel('a')
+		wheel.cancel('missing')
+		self.assertEqual(expire_between(wheel, 0.0, 20.0), {})
+
+	def test_random_schedules_expire_within_one_tick(self):
+		rng = random.Random(1234)
+		wheel = new_wheel(slots=16)
+		due = {}
+		for key in range(300):
+			now = rng.uniform(0, 10)
+			ttl = rng.uniform(0.1, 60)
+			wheel.schedule(key, ttl, now=now)
+			due[key] = now + ttl
+		# Keys were scheduled "in the past" relative to each other, replay from t=10
+		expired = expire_between(wheel, 10.0, 80.0)
+		self.assertEqual(set(expired), set(due))
+		for key, at in expired.items():
+			self.assertGreaterEqual(at, due[key])
+			self.assertLess(at, max(due[key], 10.0) + 1.0)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Replay a captured HCI byte stream through the on-air monitor, no adapter needed."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import simulate_beacon
+
+CAPTURE_FILE = Path(__file__).parent / 'data' / 'le_advertising_reports.h4.hex'
+OUR_UUID = 'bbbbbbbb-aaaa-dddd-beef-0000000000fe'
+FOREIGN_UUID = 'fda50693-a4e2-4fb1-afcf-c6eb07647825'
+
+def load_capture():
+	"""Return the capture packets as a list of bytes, one per H4 packet"""
+	packets = []
+	for line in CAPTURE_FILE.read_text().splitlines():
+		line = line.strip()
+		if line and not line.startswith('#'):
+			packets.append(bytes.fromhex(line))
+	return packets
+
+def replay(monitor, stream, chunk_size, start=1000.0):
+	"""Feed stream in chunk_size pieces, one second apart; return the parser's report count"""
+	found = 0
+	for i, offset in enumerate(range(0, len(stream), chunk_size)):
+		found += monitor.feed(stream[offset:offset + chunk_size], start + i)
+	return found
+
+def new_monitor():
+	monitor = simulate_beacon.OnAirMonitor(window_seconds=10, gap_threshold=1.0)
+	monitor.set_identities([
+		{'uuid': OUR_UUID, 'major': 1, 'minor': 2},
+		{'uuid': OUR_UUID, 'major': 1, 'minor': 3},
+	])
+	return monitor
+
+def stats_by_minor(monitor, now):
+	return {stats['minor']: stats for stats in monitor.snapshot(now=now)}
+
+class OnAirMonitorReplayTest(unittest.TestCase):
+
+	def setUp(self):
+		self.packets = load_capture()
+		self.stream = b''.join(self.packets)
+
+	def test_replay_with_arbitrary_chunking(self):
+		for chunk_size in (1, 2, 3, 7, 64, len(self.stream)):
+			with self.subTest(chunk_size=chunk_size):
+				monitor = new_monitor()
+				# Three of ours plus the foreign iBeacon; non-iBeacon reports are not counted
+				self.assertEqual(replay(monitor, self.stream, chunk_size), 4)
+				self.assertEqual(monitor.total_reports, 3)
+				stats = stats_by_minor(monitor, now=2000.0)
+				self.assertEqual(stats[2]['reports'], 2)
+				self.assertEqual(stats[2]['rssi'], -61)
+				self.assertEqual(stats[3]['reports'], 1)
+				self.assertEqual(stats[3]['rssi'], -55)
+
+	def test_unknown_identity_is_not_tracked(self):
+		monitor = new_monitor()
+		replay(monitor, self.stream, len(self.stream))
+		snapshot = monitor.snapshot(now=2000.0)
+		self.assertEqual(len(snapshot), 2)
+		self.assertNotIn(FOREIGN_UUID, {stats['uuid'] for stats in snapshot})
+
+	def test_truncated_packet_is_kept_until_complete(self):
+		monitor = new_monitor()
+		replay(monitor, self.stream, 5)
+		self.assertEqual(stats_by_minor(monitor, now=2000.0)[2]['reports'], 2)
+		# The capture ends mid-packet: rebuild the full packet and feed the rest
+		truncated = self.packets[-1]
+		complete = self.packets[2][:-1] + bytes([256 - 62])
+		self.assertTrue(complete.startswith(truncated))
+		self.assertEqual(monitor.feed(complete[len(truncated):], 2000.0), 1)
+		stats = stats_by_minor(monitor, now=2000.0)[2]
+		self.assertEqual(stats['reports'], 3)
+		self.assertEqual(stats['rssi'], -62)
+
+	def test_resyncs_after_garbage(self):
+		monitor = new_monitor()
+		found = monitor.feed(b'\xff\x00\xaa' + self.packets[2], 1000.0)
+		self.assertEqual(found, 1)
+		self.assertEqual(monitor.total_reports, 1)
+
+	def test_rate_and_gaps(self):
+		monitor = new_monitor()
+		report = self.packets[2]
+		# 2 reports per second for 10 seconds, then 3 seconds of silence
+		for i in range(20):
+			monitor.feed(report, 1000.0 + i * 0.5)
+		monitor.feed(report, 1013.0)
+		stats = stats_by_minor(monitor, now=1013.5)[2]
+		self.assertEqual(stats['gaps'], 1)
+		self.assertEqual(stats['max_gap_ms'], 3500)
+		self.assertEqual(stats['current_gap_ms'], 500)
+		# Window is seconds 1003-1012: 7 seconds with 2 reports, 3 silent ones
+		self.assertEqual(stats['rate_hz'], 1.4)
+
+	def test_rate_does_not_modify_stats(self):
+		monitor = new_monitor()
+		monitor.feed(self.packets[2], 1000.0)
+		beacon_stats = monitor._index[simulate_beacon.beacon_identity(OUR_UUID, 1, 2)]
+		buckets = list(beacon_stats.buckets)
+		bucket_second = beacon_stats.bucket_second
+		beacon_stats.rate(5000.0)
+		self.assertEqual(beacon_stats.buckets, buckets)
+		self.assertEqual(beacon_stats.bucket_second, bucket_second)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Preset import validation and the streaming NDJSON/CSV readers, against a throwaway config file."""
+
+import csv
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import simulate_beacon
+
+UUID = 'bbbbbbbb-aaaa-dddd-beef-0000000000fe'
+
+def ndjson(*rows):
+	return io.BytesIO(''.join(row + '\n' for row in rows).encode('utf-8'))
+
+def csv_stream(text):
+	return io.BytesIO(text.encode('utf-8'))
+
+class ParseIntegerFieldTest(unittest.TestCase):
+
+	def test_accepts_integers(self):
+		for value, expected in ((3, 3), (1.0, 1), ('3', 3), (' 3 ', 3), ('-59', -59)):
+			with self.subTest(value=value):
+				self.assertEqual(simulate_beacon.parse_integer_field('major', value), expected)
+
+	def test_rejects_non_integers(self):
+		for value in (True, False, 1.5, '1.5', '1e3', '', 'abc', None, [1]):
+			with self.subTest(value=value):
+				with self.assertRaises(ValueError):
+					simulate_beacon.parse_integer_field('major', value)
+
+class ValidateBeaconRowTest(unittest.TestCase):
+
+	def test_normalizes_strings_and_defaults_rssi(self):
+		beacon = simulate_beacon.validate_beacon_row({'name': ' Door ', 'uuid': UUID, 'major': '1', 'minor': 2})
+		self.assertEqual(beacon, {'name': 'Door', 'uuid': UUID, 'major': 1, 'minor': 2, 'rssi': -59})
+
+	def test_rejects_invalid_rows(self):
+		bad_rows = (
+			{'uuid': UUID, 'major': 1.9, 'minor': 1},
+			{'uuid': UUID, 'major': 1, 'minor': True},
+			{'uuid': 'not-a-uuid', 'major': 1, 'minor': 1},
+			{'uuid': UUID, 'major': 65536, 'minor': 1},
+			{'uuid': UUID, 'major': 1, 'minor': -1},
+			{'uuid': UUID, 'major': 1, 'minor': 1, 'rssi': 128},
+			{'uuid': UUID, 'minor': 1},
+			[UUID, 1, 1],
+		)
+		for row in bad_rows:
+			with self.subTest(row=row):
+				with self.assertRaises(ValueError):
+					simulate_beacon.validate_beacon_row(row)
+
+class RowReaderTest(unittest.TestCase):
+
+	def test_ndjson_reports_physical_row_numbers(self):
+		rows = list(simulate_beacon.iter_ndjson_rows(ndjson('{"a": 1}', '', '{broken', '{"b": 2}')))
+		self.assertEqual([number for number, _ in rows], [1, 3, 4])
+		self.assertEqual(rows[0][1], {'a': 1})
+		self.assertIsInstance(rows[1][1], ValueError)
+		self.assertEqual(rows[2][1], {'b': 2})
+
+	def test_csv_continues_after_malformed_row(self):
+		limit = csv.field_size_limit()
+		csv.field_size_limit(64)
+		try:
+			text = 'name,uuid,major,minor\n' + f'a,{UUID},1,1\n' + f'{"x" * 100},{UUID},2,2\n' + f'c,{UUID},3,3\n'
+			rows = list(simulate_beacon.iter_csv_rows(csv_stream(text)))
+		finally:
+			csv.field_size_limit(limit)
+		self.assertEqual([number for number, _ in rows], [2, 3, 4])
+		self.assertEqual(rows[0][1]['major'], '1')
+		self.assertIsInstance(rows[1][1], ValueError)
+		self.assertEqual(rows[2][1]['name'], 'c')
+
+class ImportBeaconsConfigTest(unittest.TestCase):
+
+	def setUp(self):
+		self.tmpdir = tempfile.TemporaryDirectory()
+		self.original_config = simulate_beacon.CONFIG_FILE
+		simulate_beacon.CONFIG_FILE = Path(self.tmpdir.name) / 'beacons_config.json'
+
+	def tearDown(self):
+		simulate_beacon.CONFIG_FILE = self.original_config
+		self.tmpdir.cleanup()
+
+	def assert_no_tmp_left(self):
+		self.assertEqual([p.name for p in Path(self.tmpdir.name).iterdir() if p.suffix == '.tmp'], [])
+
+	def test_appends_to_existing_presets(self):
+		existing = [{'name': 'Old', 'uuid': UUID, 'major': 9, 'minor': 9, 'rssi': -59}]
+		simulate_beacon.save_beacons_config(existing)
+		rows = simulate_beacon.iter_ndjson_rows(ndjson(
+			json.dumps({'name': 'New', 'uuid': UUID, 'major': 1, 'minor': 2}),
+			json.dumps({'uuid': UUID, 'major': 1.5, 'minor': 2}),
+			'{broken',
+		))
+		result = simulate_beacon.import_beacons_config(rows)
+		self.assertEqual((result['imported'], result['failed'], result['total']), (1, 2, 2))
+		self.assertEqual([error['row'] for error in result['errors']], [2, 3])
+		expected = existing + [{'name': 'New', 'uuid': UUID, 'major': 1, 'minor': 2, 'rssi': -59}]
+		# Byte-for-byte what save_beacons_config would have written
+		self.assertEqual(simulate_beacon.CONFIG_FILE.read_text(), json.dumps(expected, indent=2))
+		self.assert_no_tmp_left()
+
+	def test_no_write_when_nothing_imported(self):
+		result = simulate_beacon.import_beacons_config(simulate_beacon.iter_ndjson_rows(ndjson('{broken')))
+		self.assertEqual((result['imported'], result['failed']), (0, 1))
+		self.assertFalse(simulate_beacon.CONFIG_FILE.exists())
+		self.assert_no_tmp_left()
+		
+		simulate_beacon.save_beacons_config([])
+		before = simulate_beacon.CONFIG_FILE.stat().st_mtime_ns
+		simulate_beacon.import_beacons_config(simulate_beacon.iter_csv_rows(csv_stream(f'uuid,major,minor\n{UUID},true,1\n')))
+		self.assertEqual(simulate_beacon.CONFIG_FILE.stat().st_mtime_ns, before)
+		self.assert_no_tmp_left()
+
+	def test_error_list_is_capped(self):
+		lines = ['{broken'] * (simulate_beacon.MAX_IMPORT_ERRORS + 5)
+		result = simulate_beacon.import_beacons_config(simulate_beacon.iter_ndjson_rows(ndjson(*lines)))
+		self.assertEqual(result['failed'], simulate_beacon.MAX_IMPORT_ERRORS + 5)
+		self.assertEqual(len(result['errors']), simulate_beacon.MAX_IMPORT_ERRORS)
+
+if __name__ == '__main__':
+	unittest.main()